@@ -1,3 +1,14 @@
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import streamlit as st
 import pandas as pd
 
@@ -6,17 +17,154 @@ import pandas as pd
 # Data loading & preparation
 # -----------------------------
 
-def load_oasis_excel(file) -> pd.DataFrame:
-    """Load contract info + pool sheets and return a merged dataframe."""
+# Pool sheet names, compared after stripping
+POOL_SHEETS = {
+    "8a",
+    "Small Business",
+    "Woman Owned SB",
+    "Service Disabled Veteran Owned",
+    "HUBZone",
+    "Unrestricted",
+}
+
+FACET_COLS = ["Pool", "Domain", "NAICS", "SIN"]
+SEARCH_COL = "_search_blob"
+
+# Arrow-backed strings for all text columns
+TEXT_DTYPE = pd.StringDtype("pyarrow")
+
+# Columns the app uses; everything else is skipped at parse time
+USED_COLS = {
+    "Contract #",
+    "Contract Number",
+    "Vendor",
+    "Vendor Name",
+    "Domain",
+    "SIN",
+    "NAICS",
+    "UEI",
+    "Vendor City",
+    "ZIP Code",
+}
+
+# Prefer calamine; fall back to read-only openpyxl
+try:
+    import python_calamine  # noqa: F401
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+    EXCEL_ENGINE_KWARGS = {"read_only": True, "data_only": True, "keep_links": False}
+else:
+    EXCEL_ENGINE = "calamine"
+    EXCEL_ENGINE_KWARGS = {}
+
+# Parquet copies of merged workbooks (OASIS_CACHE_DIR to override)
+CACHE_DIR = Path(
+    os.environ.get("OASIS_CACHE_DIR", Path(tempfile.gettempdir()) / "oasis_cache")
+)
+# Bump whenever the shape of the merged frame changes
+CACHE_VERSION = 3
+# Newest cache files kept; older ones and other versions are pruned on write.
+CACHE_MAX_FILES = 16
+
+
+@st.cache_data(show_spinner=False)
+def load_oasis_excel(file_bytes: bytes) -> pd.DataFrame:
+    """Return the merged dataframe for a workbook, parsing it at most once.
+
+    Takes the raw workbook bytes so Streamlit can cache the result across
+    reruns. Behind that in-process cache sits a Parquet copy on disk keyed
+    by a BLAKE2b digest of the bytes, so a restarted app skips the xlsx
+    parse for a workbook it has already seen.
+    """
+    digest = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+    path = CACHE_DIR / f"oasis_v{CACHE_VERSION}_{digest}.parquet"
+    if path.exists():
+        try:
+            return read_cached_frame(path)
+        except (OSError, pa.ArrowException):
+            # Truncated, foreign or unreadable file: drop it and re-parse.
+            path.unlink(missing_ok=True)
+
+    merged = parse_oasis_workbook(file_bytes)
+
+    # Best-effort; temp name + rename so readers never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        merged.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, path)
+        prune_cache()
+    except (OSError, pa.ArrowException):
+        tmp_path.unlink(missing_ok=True)
+
+    return merged
 
-    xls = pd.ExcelFile(file)
 
-    # --- Contract Information sheet ---
-    contracts = pd.read_excel(
-        file,
-        sheet_name="OASIS+Contract Information",
-        header=1,  # row 2 in Excel is header
+def prune_cache() -> None:
+    """Delete all but the ``CACHE_MAX_FILES`` newest current-version files."""
+    files = sorted(
+        CACHE_DIR.glob("oasis_v*_*.parquet"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    current = [p for p in files if p.name.startswith(f"oasis_v{CACHE_VERSION}_")]
+    keep = set(current[:CACHE_MAX_FILES])
+    for p in files:
+        if p not in keep:
+            p.unlink(missing_ok=True)
+
+
+def read_cached_frame(path: Path) -> pd.DataFrame:
+    """Read a cached merged frame back with the dtypes the parser produces.
+
+    pandas < 3 reads Parquet strings back as Python-object ``string``
+    columns and category labels as ``object``, so both are mapped back to
+    ``TEXT_DTYPE`` explicitly.
+    """
+    merged = pq.read_table(path).to_pandas(
+        types_mapper={pa.string(): TEXT_DTYPE, pa.large_string(): TEXT_DTYPE}.get
     )
+    for col in merged.columns:
+        if isinstance(merged[col].dtype, pd.CategoricalDtype):
+            categories = merged[col].cat.categories
+            merged[col] = merged[col].cat.rename_categories(
+                categories.astype(TEXT_DTYPE)
+            )
+    return merged
+
+
+def is_used_col(name) -> bool:
+    """``usecols`` predicate; sheet headers may carry stray whitespace."""
+    return str(name).strip() in USED_COLS
+
+
+def parse_oasis_workbook(file_bytes: bytes) -> pd.DataFrame:
+    """Load contract info + pool sheets and return a merged dataframe."""
+
+    # Open the workbook once and parse every sheet from the same handle
+    with pd.ExcelFile(
+        io.BytesIO(file_bytes),
+        engine=EXCEL_ENGINE,
+        engine_kwargs=EXCEL_ENGINE_KWARGS,
+    ) as xls:
+        # --- Contract Information sheet ---
+        # dtype=object: no numeric inference, so codes never gain a ".0"
+        contracts = xls.parse(
+            "OASIS+Contract Information",
+            header=1,  # row 2 in Excel is header
+            usecols=is_used_col,
+            dtype=object,
+        )
+
+        # --- Pool sheets ---
+        pool_frames = []
+        for sheet in xls.sheet_names:
+            if sheet.strip() in POOL_SHEETS:
+                df = xls.parse(sheet, usecols=is_used_col, dtype=object)
+                df.columns = [c.strip() for c in df.columns]
+                df["Pool"] = sheet.strip()
+                pool_frames.append(df)
+
     contracts.columns = [c.strip() for c in contracts.columns]
 
     if "Contract Number" not in contracts.columns:
@@ -24,25 +172,6 @@ def load_oasis_excel(file) -> pd.DataFrame:
             f"'Contract Number' not found in contract sheet. Columns: {contracts.columns.tolist()}"
         )
 
-    # --- Pool sheets ---
-    pool_sheet_names = [
-        "8a",
-        "Small Business",
-        "Woman Owned SB",
-        "Service Disabled Veteran Owned",
-        "Service Disabled Veteran Owned ",
-        "HUBZone",
-        "Unrestricted",
-    ]
-
-    pool_frames = []
-    for sheet in xls.sheet_names:
-        if sheet.strip() in [name.strip() for name in pool_sheet_names]:
-            df = pd.read_excel(file, sheet_name=sheet)
-            df.columns = [c.strip() for c in df.columns]
-            df["Pool"] = sheet.strip()
-            pool_frames.append(df)
-
     if not pool_frames:
         raise ValueError("No pool sheets found in workbook.")
 
@@ -56,91 +185,200 @@ def load_oasis_excel(file) -> pd.DataFrame:
     # --- Normalize keys & common fields ---
 
     # Contract number fields
-    pools["Contract #"] = (
-        pools["Contract #"].astype(str).str.replace(".0", "", regex=False).str.strip()
-    )
+    pools["Contract #"] = pools["Contract #"].astype(TEXT_DTYPE).str.strip()
     contracts["Contract Number"] = (
-        contracts["Contract Number"]
-        .astype(str)
-        .str.replace(".0", "", regex=False)
-        .str.strip()
+        contracts["Contract Number"].astype(TEXT_DTYPE).str.strip()
     )
 
     # NAICS / SIN as strings
     for col in ["NAICS", "SIN"]:
         if col in pools.columns:
-            pools[col] = (
-                pools[col].astype(str).str.replace(".0", "", regex=False).str.strip()
-            )
+            pools[col] = pools[col].astype(TEXT_DTYPE).str.strip()
 
-    # Merge
+    # Merge on shared integer codes rather than the string keys
+    codes, _ = pd.factorize(
+        pd.concat([pools["Contract #"], contracts["Contract Number"]], ignore_index=True)
+    )
+    pools["_key"] = codes[: len(pools)]
+    contracts["_key"] = codes[len(pools):]
     merged = pools.merge(
         contracts,
-        left_on="Contract #",
-        right_on="Contract Number",
+        on="_key",
         how="left",
         suffixes=("", "_contract"),
-    )
+    ).drop(columns="_key")
 
     # Vendor Display
     vendor_cols = [c for c in ["Vendor", "Vendor Name"] if c in merged.columns]
     if vendor_cols:
-        merged["Vendor Display"] = (
-            merged[vendor_cols].bfill(axis=1).iloc[:, 0].fillna("")
-        )
+        # First non-missing of Vendor / Vendor Name
+        for col in vendor_cols:
+            merged[col] = merged[col].astype(TEXT_DTYPE)
+        vendor = merged[vendor_cols[0]]
+        for col in vendor_cols[1:]:
+            vendor = vendor.fillna(merged[col])
+        merged["Vendor Display"] = vendor.fillna("")
     else:
         merged["Vendor Display"] = ""
 
+    # Categorical so summarize() dedupes integer codes
+    merged["Vendor Display"] = merged["Vendor Display"].astype("category")
+
     # Ensure some columns exist & are strings for filtering
     for col in ["Pool", "Domain", "NAICS", "SIN", "UEI", "Vendor City", "ZIP Code"]:
         if col not in merged.columns:
             merged[col] = pd.NA
-        merged[col] = merged[col].astype(str)
+        merged[col] = merged[col].astype(TEXT_DTYPE)
+
+    # Remaining raw columns, e.g. "ZIP Code_contract" when both sheets have one
+    for col in merged.select_dtypes("object").columns:
+        merged[col] = merged[col].astype(TEXT_DTYPE)
+
+    # Low-cardinality facet columns as categoricals
+    for col in FACET_COLS:
+        merged[col] = merged[col].astype("category")
+
+    # Lowercased search haystack; \x1f separator stops cross-field matches
+    vendor, uei, contract = (
+        merged[c].astype(TEXT_DTYPE).fillna("")
+        for c in ["Vendor Display", "UEI", "Contract #"]
+    )
+    merged[SEARCH_COL] = (
+        vendor + "\x1f" + uei + "\x1f" + contract
+    ).str.lower()
 
     return merged
 
 
-def apply_filters(df: pd.DataFrame,
-                  search_text: str,
-                  pools_selected,
-                  domains_selected,
-                  naics_selected,
-                  sin_selected) -> pd.DataFrame:
-    """Apply text and facet filters to the merged dataframe."""
-    filtered = df.copy()
+def facet_options(col: pd.Series) -> list:
+    """Sorted option list for a facet multiselect.
 
-    # Free-text search
-    if search_text:
-        s = search_text.lower()
-        mask = False
-        for col in ["Vendor Display", "UEI", "Contract Number", "Contract #"]:
-            if col in filtered.columns:
-                mask = mask | filtered[col].astype(str).str.lower().str.contains(s, na=False)
-        filtered = filtered[mask]
+    Facet columns are categoricals, so this sorts the handful of categories
+    instead of scanning the whole column each rerun. Other columns go
+    through Arrow's unique/sort kernels rather than Python set/sorted.
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.categories.sort_values().tolist()
+
+    values = pc.unique(pa.array(col, from_pandas=True)).drop_null()
+    return values.take(pc.array_sort_indices(values)).to_pylist()
+
+
+def category_mask(col: pd.Series, selected) -> np.ndarray:
+    """Rows of a categorical column whose value is in ``selected``.
 
-    # Pool
-    if pools_selected:
-        filtered = filtered[filtered["Pool"].isin(pools_selected)]
+    Resolves the selection to category codes once, then maps every row's
+    code through a small lookup table instead of hashing values per row.
+    """
+    codes = col.cat.categories.get_indexer(list(selected))
+    # Spare trailing slot stays False so missing values (code -1) never match
+    keep = np.zeros(len(col.cat.categories) + 1, dtype=bool)
+    keep[codes[codes >= 0]] = True
+    return keep[col.cat.codes.to_numpy()]
 
-    # Domain
-    if domains_selected:
-        filtered = filtered[filtered["Domain"].isin(domains_selected)]
 
-    # NAICS
-    if naics_selected:
-        filtered = filtered[filtered["NAICS"].isin(naics_selected)]
+def filter_mask(df: pd.DataFrame,
+                search_text: str,
+                pools_selected,
+                domains_selected,
+                naics_selected,
+                sin_selected) -> np.ndarray:
+    """Boolean row mask for the text and facet filters.
 
-    # SIN
-    if sin_selected:
-        filtered = filtered[filtered["SIN"].isin(sin_selected)]
+    Each active filter is ANDed in place into a single boolean ndarray.
+    """
+    mask = np.ones(len(df), dtype=bool)
 
-    return filtered
+    # Free-text search
+    if search_text:
+        # Blob is stored lowercase, so only the query needs lowering
+        s = search_text.lower()
+        mask &= df[SEARCH_COL].str.contains(s, regex=False, na=False).to_numpy(dtype=bool)
+
+    # Pool / Domain / NAICS / SIN
+    for col, selected in [
+        ("Pool", pools_selected),
+        ("Domain", domains_selected),
+        ("NAICS", naics_selected),
+        ("SIN", sin_selected),
+    ]:
+        if selected:
+            mask &= category_mask(df[col], selected)
+
+    return mask
+
+
+def summarize(df: pd.DataFrame) -> dict:
+    """Headline metrics and per-facet vendor counts for the filtered data.
+
+    The frame is reduced to its distinct (Pool, NAICS, Domain, vendor) rows
+    once; the unique counts and the three chart series are all read off that
+    small frame instead of each rescanning ``df``.
+    """
+    chart_cols = ["Pool", "NAICS", "Domain"]
+    distinct = df[chart_cols + ["Vendor Display"]].drop_duplicates()
+    return {
+        "vendors": distinct["Vendor Display"].nunique(),
+        "naics": distinct["NAICS"].nunique(),
+        "pools": distinct["Pool"].nunique(),
+        "vendors_by": {
+            col: distinct.groupby(col, observed=True, sort=False)["Vendor Display"].nunique()
+            for col in chart_cols
+        },
+    }
+
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a dataframe to CSV for the download button.
+
+    Uses Arrow's C++ CSV writer; falls back to pandas for object columns
+    Arrow can't type (e.g. mixed numbers and text in an unused column).
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df.to_csv(index=False).encode("utf-8")
+
+    buf = io.BytesIO()
+    pa_csv.write_csv(table, buf)
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def filter_and_summarize(_data: pd.DataFrame,
+                         data_key: str,
+                         search_text: str,
+                         pools_selected: tuple,
+                         domains_selected: tuple,
+                         naics_selected: tuple,
+                         sin_selected: tuple) -> dict:
+    """Selected row positions and summary for one filter state.
+
+    Cached on the filter selections (as tuples) plus ``data_key``, which
+    identifies the loaded workbook; ``_data`` itself is not hashed. Only the
+    row positions are stored, not the filtered frame, so a cache hit is a
+    small unpickle plus a ``take``.
+    """
+    rows = np.flatnonzero(filter_mask(
+        _data,
+        search_text=search_text,
+        pools_selected=pools_selected,
+        domains_selected=domains_selected,
+        naics_selected=naics_selected,
+        sin_selected=sin_selected,
+    ))
+    return {
+        "rows": rows,
+        "summary": summarize(_data.take(rows)),
+    }
 
 
 # -----------------------------
 # Streamlit UI
 # -----------------------------
 
+MAX_TABLE_ROWS = 1000
+
 st.set_page_config(page_title="OASIS+ Contractor Explorer", layout="wide")
 
 st.title("OASIS+ Contractor Explorer")
@@ -157,14 +395,14 @@ if uploaded_file is None:
 
 # Load data with visible errors
 try:
-    data = load_oasis_excel(uploaded_file)
+    data = load_oasis_excel(uploaded_file.getvalue())
 except Exception as e:
     st.error("❌ Error loading workbook:")
     st.exception(e)
     st.stop()
 
 st.success("✅ Workbook loaded and merged successfully.")
-st.write("Merged columns:", list(data.columns))
+st.write("Merged columns:", [c for c in data.columns if c != SEARCH_COL])
 
 # -----------------------------
 # Sidebar filters
@@ -178,27 +416,35 @@ try:
         placeholder="e.g. AEVEX, 47QRCA25D...",
     )
 
-    pool_options = sorted(set(data["Pool"].dropna().astype(str).tolist()))
+    pool_options = facet_options(data["Pool"])
     pools_selected = st.sidebar.multiselect("Pool", pool_options)
 
-    domain_options = sorted(set(data["Domain"].dropna().astype(str).tolist()))
+    domain_options = facet_options(data["Domain"])
     domains_selected = st.sidebar.multiselect("Domain", domain_options)
 
-    naics_options = sorted(set(data["NAICS"].dropna().astype(str).tolist()))
+    naics_options = facet_options(data["NAICS"])
     naics_selected = st.sidebar.multiselect("NAICS", naics_options)
 
-    sin_options = sorted(set(data["SIN"].dropna().astype(str).tolist()))
+    sin_options = facet_options(data["SIN"])
     sin_selected = st.sidebar.multiselect("SIN", sin_options)
 
-    # Apply filters
-    filtered = apply_filters(
-        data,
-        search_text=search_text,
-        pools_selected=pools_selected,
-        domains_selected=domains_selected,
-        naics_selected=naics_selected,
-        sin_selected=sin_selected,
-    )
+    # Apply filters; the landing state (nothing selected) uses the frame as is
+    if (search_text or pools_selected or domains_selected
+            or naics_selected or sin_selected):
+        result = filter_and_summarize(
+            data,
+            data_key=uploaded_file.file_id,
+            search_text=search_text,
+            pools_selected=tuple(pools_selected),
+            domains_selected=tuple(domains_selected),
+            naics_selected=tuple(naics_selected),
+            sin_selected=tuple(sin_selected),
+        )
+        filtered = data.take(result["rows"])
+        summary = result["summary"]
+    else:
+        filtered = data
+        summary = summarize(data)
 
     # -----------------------------
     # Summary metrics
@@ -206,9 +452,9 @@ try:
     col1, col2, col3, col4 = st.columns(4)
 
     col1.metric("Rows", f"{len(filtered):,}")
-    col2.metric("Unique Vendors", f"{filtered['Vendor Display'].nunique():,}")
-    col3.metric("Unique NAICS Codes", f"{filtered['NAICS'].nunique():,}")
-    col4.metric("Pools", f"{filtered['Pool'].nunique():,}")
+    col2.metric("Unique Vendors", f"{summary['vendors']:,}")
+    col3.metric("Unique NAICS Codes", f"{summary['naics']:,}")
+    col4.metric("Pools", f"{summary['pools']:,}")
 
     st.markdown("---")
 
@@ -230,15 +476,22 @@ try:
     ]
     show_cols = [c for c in show_cols if c in filtered.columns]
 
+    # Bounded slice for the browser; the CSV still has every row
     st.dataframe(
-        filtered[show_cols].reset_index(drop=True),
+        filtered[show_cols].head(MAX_TABLE_ROWS),
         use_container_width=True,
         hide_index=True,
     )
+    if len(filtered) > MAX_TABLE_ROWS:
+        st.caption(
+            f"Showing first {MAX_TABLE_ROWS:,} of {len(filtered):,} rows. "
+            "Use filters to narrow, or download CSV for the full set."
+        )
 
     st.download_button(
         "Download filtered data as CSV",
-        data=filtered.to_csv(index=False),
+        # Built only when the button is clicked
+        data=lambda: to_csv_bytes(filtered.drop(columns=SEARCH_COL)),
         file_name="oasis_filtered_export.csv",
         mime="text/csv",
     )
@@ -254,34 +507,21 @@ try:
 
     with tab1:
         if not filtered.empty:
-            by_pool = (
-                filtered.groupby("Pool")["Vendor Display"]
-                .nunique()
-                .sort_values(ascending=False)
-            )
+            by_pool = summary["vendors_by"]["Pool"].sort_values(ascending=False)
             st.bar_chart(by_pool)
         else:
             st.info("No data for current filters.")
 
     with tab2:
         if not filtered.empty:
-            by_naics = (
-                filtered.groupby("NAICS")["Vendor Display"]
-                .nunique()
-                .sort_values(ascending=False)
-                .head(20)
-            )
+            by_naics = summary["vendors_by"]["NAICS"].nlargest(20)
             st.bar_chart(by_naics)
         else:
             st.info("No data for current filters.")
 
     with tab3:
         if not filtered.empty:
-            by_domain = (
-                filtered.groupby("Domain")["Vendor Display"]
-                .nunique()
-                .sort_values(ascending=False)
-            )
+            by_domain = summary["vendors_by"]["Domain"].sort_values(ascending=False)
             st.bar_chart(by_domain)
         else:
             st.info("No data for current filters.")